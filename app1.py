@@ -7,18 +7,396 @@ warnings.filterwarnings("ignore", message="Workbook contains no default style*")
 
 import io
 
-def download_excel(df, filename, label):
+@st.cache_data(show_spinner=False)
+def to_excel_bytes(df):
     buffer = io.BytesIO()
     with pd.ExcelWriter(buffer, engine="xlsxwriter") as writer:
         df.to_excel(writer, index=True)  # ✅ MultiIndex safe
+    return buffer.getvalue()
+
+
+def download_excel(df, filename, label, key=None):
+    # same label/file_name wale buttons (tab1/tab7, tab2/tab8) ko alag key chahiye
+    st.download_button(
+        label=label,
+        data=lambda: to_excel_bytes(df),  # bytes sirf click pe banenge
+        file_name=filename,
+        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        on_click="ignore",  # download pe poora script rerun na ho
+        key=key
+    )
+
+
+@st.cache_data(show_spinner=False)
+def to_excel_workbook(sheets):
+    # saari reports ek hi workbook me, har df apni sheet pe
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer, engine="xlsxwriter") as writer:
+        for name, df in sheets:
+            df.to_excel(writer, sheet_name=name, index=True)
+    return buffer.getvalue()
+
+
+def download_workbook(sheets, filename, label):
     st.download_button(
         label=label,
-        data=buffer.getvalue(),
+        data=lambda: to_excel_workbook(sheets),
         file_name=filename,
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        on_click="ignore"
     )
 
 
+@st.cache_data(show_spinner=False)
+def to_parquet_bytes(df):
+    buffer = io.BytesIO()
+    # mixed-type object columns arrow me fail hote hain, unhe string rakho
+    obj_cols = df.select_dtypes("object").columns
+    df.astype({c: "string" for c in obj_cols}).to_parquet(
+        buffer, engine="pyarrow", compression="zstd"
+    )
+    return buffer.getvalue()
+
+
+def download_parquet(df, filename, label):
+    st.download_button(
+        label=label,
+        data=lambda: to_parquet_bytes(df),
+        file_name=filename,
+        mime="application/vnd.apache.parquet",
+        on_click="ignore"
+    )
+
+
+@st.cache_data(show_spinner=False)
+def bar_fig(df, x, y, title):
+    # figure dict cache hota hai, har rerun pe px.bar dobara nahi banta;
+    # df ka order hi axis order hai, Plotly ko khud sort nahi karna padta
+    return px.bar(df, x=x, y=y, title=title, category_orders={x: df[x].tolist()}).to_dict()
+
+
+# ---------- TAB FRAGMENTS ----------
+# har tab ek fragment hai: tab ke andar interaction sirf usi tab ko rerun karta hai
+@st.fragment
+def pivot_tab(df, filename, label, key, max_rows=5000):
+    if len(df) > max_rows:
+        # bahut badi pivot: pehli rows + Grand Total (last row) hi browser ko bhejo
+        st.dataframe(pd.concat([df.head(max_rows - 1), df.tail(1)]), use_container_width=True)
+        st.caption(f"Showing {max_rows:,} of {len(df):,} rows — download for full data")
+    else:
+        st.dataframe(df, use_container_width=True)
+    download_excel(df, filename, label, key=key)
+
+
+@st.fragment
+def raw_data_tab(final_df):
+    # browser ko sirf utni rows bhejo jitni dikhni hain
+    page_size = 1000
+    pages = max((len(final_df) + page_size - 1) // page_size, 1)
+    page = st.number_input("Page", min_value=1, max_value=pages, value=1, step=1)
+    start = (page - 1) * page_size
+    shown = final_df.iloc[start:start + page_size]
+    st.dataframe(shown, use_container_width=True)
+    st.caption(f"Showing rows {start + 1:,}–{start + len(shown):,} of {len(final_df):,} — download for full data")
+    download_excel(final_df, "raw_data.xlsx", "⬇️ Download Raw Data")
+    download_parquet(final_df, "raw_data.parquet", "⬇️ Download Raw Data (Parquet)")
+
+
+@st.fragment
+def chart_tab(brand_chart):
+    st.plotly_chart(bar_fig(brand_chart, "Brand", "Sales", "Sales by Brand"), use_container_width=True)
+
+
+# ---------- CACHED LOAD / TRANSFORM ----------
+PM_COLUMNS = ["FNS", "Product Name", "Vendor SKU Codes", "Brand", "Brand Manager"]
+
+try:
+    # calamine ke parse errors (XmlError / ZipError / PasswordError) sirf Exception subclass hain
+    from python_calamine import CalamineError
+except ImportError:
+    CalamineError = ValueError
+
+
+def read_excel_fast(file_bytes, usecols=None):
+    try:
+        return pd.read_excel(io.BytesIO(file_bytes), engine="calamine", usecols=usecols, dtype_backend="pyarrow")
+    except (ImportError, ValueError, CalamineError):
+        # python-calamine na ho / purana pandas / calamine file na padh paaye -> pandas khud engine chune (.xlsx openpyxl, .xls xlrd)
+        return pd.read_excel(io.BytesIO(file_bytes), usecols=usecols, dtype_backend="pyarrow")
+
+
+def pm_usecols(col):
+    # PM sheet ke baaki 20-30 columns parse hi nahi hote
+    return col in PM_COLUMNS or str(col).lower().startswith("cp")
+
+
+@st.cache_data(show_spinner=False)
+def load_flipkart(file_bytes):
+    return read_excel_fast(file_bytes, usecols=pm_usecols)
+
+
+@st.cache_data(show_spinner=False)
+def load_top(file_bytes, file_name):
+    if file_name.endswith(".csv"):
+        # pyarrow ka multithreaded CSV reader; join key ka type pehle se bata do,
+        # Order Date text hi rahe (pehle jaisa, pyarrow khud date bana deta hai)
+        return pd.read_csv(
+            io.BytesIO(file_bytes),
+            engine="pyarrow",
+            dtype_backend="pyarrow",
+            dtype={"Product Id": "string[pyarrow]", "Order Date": "string[pyarrow]"}
+        )
+    return read_excel_fast(file_bytes)
+
+
+def clean_key(s):
+    # strip/upper sirf unique values pe, phir codes se har row pe wapas lagao
+    codes, uniques = pd.factorize(s)
+    # arrow-backed strings: strip/upper/hash C++ kernels me chalte hain
+    cleaned = pd.Index(uniques).astype("string[pyarrow]").str.strip().str.upper()
+    return pd.Series(
+        cleaned.take(codes, allow_fill=True, fill_value=pd.NA), index=s.index, name=s.name
+    )
+
+
+def to_number(s):
+    # column pehle se numeric ho to coerce wala pass skip karo
+    if pd.api.types.is_numeric_dtype(s):
+        return s.fillna(0)
+    return pd.to_numeric(s, errors="coerce").fillna(0)
+
+
+@st.cache_data(show_spinner=False)
+def build_final_df(flipkart, top):
+    if "Brand" in top.columns:
+        top.rename(columns={"Brand": "Brand1"}, inplace=True)
+
+    # ---------- VALIDATION ----------
+    for c in PM_COLUMNS:
+        if c not in flipkart.columns:
+            raise KeyError(f"Flipkart PM me '{c}' missing")
+
+    if "Product Id" not in top.columns:
+        raise KeyError("Top Products me 'Product Id' missing")
+    if "Final Sale Units" not in top.columns:
+        raise KeyError("Final Sale Units missing")
+
+    is_cp = flipkart.columns.astype(str).str.lower().str.startswith("cp")
+    if not is_cp.any():
+        raise KeyError("Flipkart PM me 'CP' (cost) column missing")
+    cp_col = flipkart.columns[is_cp.argmax()]
+
+    # sirf zaroori columns rakho, poora wide PM frame copy/dedupe nahi hota
+    flipkart = flipkart[PM_COLUMNS + [cp_col]]
+
+    # ---------- CLEAN KEYS ----------
+    top["Product Id"] = clean_key(top["Product Id"])
+    flipkart["FNS"] = clean_key(flipkart["FNS"])
+
+    flipkart = flipkart.drop_duplicates("FNS")
+
+    # ---------- MERGE ----------
+    # FNS index pe join -> right side ka hash table dobara nahi banta
+    lookup = flipkart.set_index("FNS", drop=False)
+    final_df = top.merge(
+        lookup,
+        left_on="Product Id",
+        right_index=True,
+        how="left",
+        validate="many_to_one"  # PM side unique hona chahiye, warna rows fan out hongi
+    ).rename(columns={
+        "Brand Manager": "Manager",
+        cp_col: "cost"
+    })
+
+    # ---------- SAFE TEXT CLEAN ----------
+    # null-aware arrow cast: NaN "nan" string nahi banta, seedha fillna me jaata hai
+    for col in ("Product Name", "Vendor SKU Codes"):
+        final_df[col] = final_df[col].astype("string[pyarrow]").str.strip().fillna("Unknown")
+
+    # ---------- BRAND STANDARDIZATION ----------
+    # sirf unique brands pe string ops, phir codes se wapas; NaN / "nan" -> Unknown
+    codes, brands = pd.factorize(final_df["Brand"], use_na_sentinel=False)
+    brands = (
+        pd.Index(brands)
+        .astype("string[pyarrow]")
+        .str.strip()
+        .str.title()  # title() case khud sambhalta hai, alag lower() ki zaroorat nahi
+        .fillna("Unknown")
+    )
+    brands = brands.where(brands != "Nan", "Unknown")
+    final_df["Brand"] = pd.Series(brands.take(codes), index=final_df.index, name="Brand")
+
+    # ---------- NUMERIC CLEAN ----------
+    units = to_number(final_df["Final Sale Units"]).clip(lower=0)
+    # ---------- REMOVE ZERO SALE UNITS ---------- 22/12/2025 changes
+    # clip ke baad astype(int) != 0 ka matlab units >= 1 hi hai, ek hi mask kaafi
+    keep = units >= 1
+    final_df = final_df[keep]
+    # clip ke baad units non-negative hain: sab whole numbers hon toh chhota unsigned int dtype,
+    # koi fractional unit (jaise 1.5) ho toh column float hi rehta hai; Sales/cost float64 hi rahenge (₹ totals ki precision)
+    final_df["Final Sale Units"] = pd.to_numeric(units[keep], downcast="unsigned")
+
+    if "Final Sale Amount" in final_df.columns:
+        final_df.rename(columns={"Final Sale Amount": "Sales"}, inplace=True)
+
+    final_df["Sales"] = to_number(final_df["Sales"])
+    final_df["cost"] = to_number(final_df["cost"])
+    final_df["Manager"] = final_df["Manager"].fillna("Unknown")
+    final_df["FNS"] = final_df["FNS"].fillna("Unknown")
+
+    # ---------- NEW COLUMN: As Per Qty Cost ----------
+    final_df["As Per Qty Cost"] = final_df["cost"] * final_df["Final Sale Units"]
+
+    # ---------- CATEGORICAL KEYS ----------
+    # groupby / pivot int codes pe chalega, strings hash nahi honge
+    # Order Date bhi category: int codes pe group, par pivot headers wahi original date labels
+    for c in ("Brand", "Manager", "FNS", "Product Name", "Vendor SKU Codes", "Order Date"):
+        final_df[c] = final_df[c].astype("category")
+
+    return final_df
+
+
+def rollup(base, levels):
+    # base already aggregated hai, ye sirf O(groups) rows pe chalta hai
+    return base.groupby(level=levels, observed=True).sum()
+
+
+def with_cost_mean(df):
+    # cost ka average = cost ka sum / rows
+    df["cost"] = df["cost"] / df.pop("rows")
+    df["As Per Qty Cost"] = df["cost"] * df["Final Sale Units"]
+    return df
+
+
+def with_grand_total(df):
+    # Grand Total row (cost ka bhi overall mean rakho); label index ke har level ke liye
+    label = ("Grand Total",) + ("",) * (df.index.nlevels - 1)
+    totals = df[["Final Sale Units", "Sales", "As Per Qty Cost"]].sum()
+    # mixed dtype sum float deta hai: jo columns integer the (units, kabhi Sales) wo integer hi rahein
+    int_cols = [c for c in df.columns if pd.api.types.is_integer_dtype(df[c].dtype)]
+    df.loc[label] = [
+        totals["Final Sale Units"],
+        totals["Sales"],
+        df["cost"].mean(),
+        totals["As Per Qty Cost"]
+    ]
+    return df.astype({c: "int64[pyarrow]" for c in int_cols})
+
+
+def top_n_with_other(df, label_col, value_col, n=20):
+    # bahut saare brands ho to chart me top N + baaki sab "Other" me;
+    # bars pehle se value ke hisaab se descending order me
+    if len(df) <= n:
+        return df.sort_values(value_col, ascending=False, ignore_index=True)
+    top = df.nlargest(n, value_col)
+    other = pd.DataFrame({label_col: ["Other"], value_col: [df[value_col].sum() - top[value_col].sum()]})
+    return pd.concat([top, other], ignore_index=True)
+
+
+@st.cache_data(show_spinner=False)
+def build_pivots(final_df):
+    # ---------- SINGLE PASS BASE ----------
+    # final_df pe ek hi groupby (Order Date tak); baaki sab pivots isi se roll up hote hain
+    grouped = final_df.groupby(
+        ["FNS", "Manager", "Brand", "Product Name", "Vendor SKU Codes", "Order Date"],
+        observed=True,
+        sort=False,  # order rollups me aata hai, yahan sort bekaar hai
+        dropna=False
+    )
+    base = grouped[["Final Sale Units", "Sales", "cost"]].sum()
+    base["rows"] = grouped.size()
+
+    # har level pichhle (chhote) level se roll up hota hai:
+    # base (date wise) -> Manager/Brand/FNS -> Brand/FNS -> Brand
+    sums_mbf = rollup(base, ["FNS", "Manager", "Brand", "Product Name", "Vendor SKU Codes"])
+    sums_bf = rollup(sums_mbf, ["FNS", "Brand", "Product Name", "Vendor SKU Codes"])
+    brand_totals = rollup(sums_bf, "Brand")
+    # Brand ab kabhi missing nahi (Unknown), toh Manager totals bhi chhote sums_mbf se
+    manager_totals = rollup(sums_mbf, "Manager")
+
+    # dono date pivots ka Grand Total same hai: date wise totals + overall totals,
+    # pivot ke saare cells dobara sum nahi karne padte
+    date_totals = rollup(base, "Order Date")[["Final Sale Units", "Sales"]]
+    # overall base se: blank Order Date wali rows bhi total me count hoti hain
+    overall = base[["Final Sale Units", "Sales"]].sum()
+    grand_row = pd.concat([
+        date_totals.stack(),
+        pd.Series({
+            ("Total sum of Final Sale Units", ""): overall["Final Sale Units"],
+            ("Total sum of Sales", ""): overall["Sales"]
+        })
+    ])
+
+    # ---------- BRAND + GRAND TOTAL ----------
+    pivot = (
+        rollup(base, ["Brand", "Order Date"])[["Final Sale Units", "Sales"]]
+        .unstack("Order Date", fill_value=0)
+    )
+
+    # Swap levels to bring Order Date on top
+    pivot.columns = pivot.columns.swaplevel(0, 1)
+    pivot = pivot.sort_index(axis=1, level=0)
+
+    # Add totals columns on right
+    pivot["Total sum of Final Sale Units"] = brand_totals["Final Sale Units"]
+    pivot["Total sum of Sales"] = brand_totals["Sales"]
+
+    # Add Grand Total row at bottom
+    pivot.loc["Grand Total"] = grand_row.reindex(pivot.columns)
+    brand_date = pivot
+
+    # ---------- MANAGER + GRAND TOTAL ----------
+    pivot = (
+        rollup(base, ["Manager", "Order Date"])[["Final Sale Units", "Sales"]]
+        .unstack("Order Date", fill_value=0)
+    )
+
+    pivot.columns = pivot.columns.swaplevel(0, 1)
+    pivot = pivot.sort_index(axis=1, level=0)
+
+    # Add totals columns on right
+    pivot["Total sum of Final Sale Units"] = manager_totals["Final Sale Units"]
+    pivot["Total sum of Sales"] = manager_totals["Sales"]
+
+    # Grand Total row
+    pivot.loc["Grand Total"] = grand_row.reindex(pivot.columns)
+    manager_date = pivot
+
+    # ---------- CHART DATA ----------
+    brand_chart = top_n_with_other(brand_totals["Sales"].reset_index(), "Brand", "Sales")
+
+    # ---------- BRAND / FNS ----------
+    # ✔ cost ka average lo (sum / rows se)
+    base_bf = with_cost_mean(sums_bf)
+
+    brand_fns = with_grand_total(base_bf)
+
+    # ---------- MANAGER / BRAND / FNS ----------
+    # ⚠ cost ko sum nahi, average/mean rakho
+    base_mbf = with_cost_mean(sums_mbf)
+
+    manager_brand_fns = with_grand_total(base_mbf)
+
+    # ---------- BRAND PIVOT ----------
+    brand_pivot = brand_totals[["Final Sale Units", "Sales"]].rename(columns={
+        "Final Sale Units": "Sum of Final Sale Units",
+        "Sales": "Sum of Final Sale Amount"
+    })
+
+    brand_pivot.loc["Grand Total"] = brand_pivot.sum(numeric_only=True)
+
+    # ---------- BRAND MANAGER PIVOT ----------
+    manager_pivot = manager_totals[["Final Sale Units", "Sales"]].rename(columns={
+        "Final Sale Units": "Sum of Final Sale Units",
+        "Sales": "Sum of Final Sale Amount"
+    })
+
+    manager_pivot.loc["Grand Total"] = manager_pivot.sum(numeric_only=True)
+
+    return brand_date, manager_date, brand_chart, brand_fns, manager_brand_fns, brand_pivot, manager_pivot
+
+
 
 # ---------- PAGE CONFIG ----------
 st.set_page_config(page_title="Flipkart Sales Analysis", layout="wide")
@@ -53,84 +431,20 @@ if generate:
     else:
         try:
             # ---------- LOAD ----------
-            flipkart = pd.read_excel(flipkart_file)
-            top = pd.read_csv(top_products_file) if top_products_file.name.endswith(".csv") else pd.read_excel(top_products_file)
-
-            if "Brand" in top.columns:
-                top.rename(columns={"Brand": "Brand1"}, inplace=True)
-
-            # ---------- VALIDATION ----------
-            required_pm = ["FNS", "Product Name", "Vendor SKU Codes", "Brand", "Brand Manager"]
-            for c in required_pm:
-                if c not in flipkart.columns:
-                    raise KeyError(f"Flipkart PM me '{c}' missing")
-
-            if "Product Id" not in top.columns:
-                raise KeyError("Top Products me 'Product Id' missing")
-            if "Final Sale Units" not in top.columns:
-                raise KeyError("Final Sale Units missing")
-
-            # ---------- CLEAN KEYS ----------
-            top["Product Id"] = top["Product Id"].astype(str).str.strip().str.upper()
-            flipkart["FNS"] = flipkart["FNS"].astype(str).str.strip().str.upper()
-
-            flipkart = flipkart.drop_duplicates("FNS")
-
-            cp_col = [c for c in flipkart.columns if str(c).lower().startswith("cp")][0]
-
-            # ---------- MERGE ----------
-            final_df = top.merge(
-                flipkart[
-                    ["FNS", "Product Name", "Vendor SKU Codes", "Brand", "Brand Manager", cp_col]
-                ],
-                left_on="Product Id",
-                right_on="FNS",
-                how="left"
-            ).rename(columns={
-                "Brand Manager": "Manager",
-                cp_col: "cost"
-            })
-
-            # ---------- SAFE TEXT CLEAN ----------
-            def clean_text(x):
-                try:
-                    if pd.isna(x):
-                        return "Unknown"
-                    return str(x).strip()
-                except Exception:
-                    return "Unknown"
-
-            final_df["Product Name"] = final_df["Product Name"].apply(clean_text)
-            final_df["Vendor SKU Codes"] = final_df["Vendor SKU Codes"].apply(clean_text)
-
-            # ---------- BRAND STANDARDIZATION ----------
-            final_df["Brand"] = (
-                final_df["Brand"]
-                .astype(str)
-                .str.strip()
-                .str.lower()
-                .str.title()
-                .replace("Nan", "Unknown")
-            )
-
-            # ---------- NUMERIC CLEAN ----------
-            final_df["Final Sale Units"] = pd.to_numeric(
-                final_df["Final Sale Units"], errors="coerce"
-            ).fillna(0).clip(lower=0)
-            # ---------- REMOVE ZERO SALE UNITS ---------- 22/12/2025 changes
-            final_df["Final Sale Units"] = pd.to_numeric(final_df["Final Sale Units"], errors="coerce").fillna(0)
-            final_df = final_df[final_df["Final Sale Units"].astype(int) != 0]
-
-            if "Final Sale Amount" in final_df.columns:
-                final_df.rename(columns={"Final Sale Amount": "Sales"}, inplace=True)
-
-            final_df["Sales"] = pd.to_numeric(final_df["Sales"], errors="coerce").fillna(0)
-            final_df["cost"] = pd.to_numeric(final_df["cost"], errors="coerce").fillna(0)
-            final_df["Manager"] = final_df["Manager"].fillna("Unknown")
-            final_df["FNS"] = final_df["FNS"].fillna("Unknown")
-            
-            # ---------- NEW COLUMN: As Per Qty Cost ----------
-            final_df["As Per Qty Cost"] = final_df["cost"] * final_df["Final Sale Units"]
+            # same uploads -> session_state se lo; cache_data ko bytes/frames
+            # dobara hash nahi karne padte
+            report_key = (flipkart_file.file_id, top_products_file.file_id)
+            if st.session_state.get("report_key") != report_key:
+                flipkart = load_flipkart(flipkart_file.getvalue())
+                top = load_top(top_products_file.getvalue(), top_products_file.name)
+                final_df = build_final_df(flipkart, top)
+                st.session_state["report"] = (final_df, build_pivots(final_df))
+                st.session_state["report_key"] = report_key
+
+            final_df, (
+                brand_date, manager_date, brand_chart,
+                brand_fns, manager_brand_fns, brand_pivot, manager_pivot
+            ) = st.session_state["report"]
 
             # ---------- METRICS ----------
             st.markdown("---")
@@ -154,186 +468,50 @@ if generate:
 
             # ---------- TAB 1 (BRAND + GRAND TOTAL) ----------
             with tab1:
-                pivot = final_df.pivot_table(
-                    index="Brand",
-                    columns="Order Date",
-                    values=["Final Sale Units", "Sales"],
-                    aggfunc="sum",
-                    fill_value=0
-                )
-
-                # Swap levels to bring Order Date on top
-                pivot.columns = pivot.columns.swaplevel(0, 1)
-                pivot = pivot.sort_index(axis=1, level=0)
-
-                # Rebuild columns as (date, metric) pairs
-                pivot.columns = pd.MultiIndex.from_tuples(
-                    [(date, "Final Sale Units") if metric == "Final Sale Units" else (date, "Sales")
-                    for date, metric in pivot.columns]
-                )
-
-                # Add totals columns on right
-                pivot["Total sum of Final Sale Units"] = final_df.groupby("Brand")["Final Sale Units"].sum()
-                pivot["Total sum of Sales"] = final_df.groupby("Brand")["Sales"].sum()
-
-                # Add Grand Total row at bottom
-                pivot.loc["Grand Total"] = pivot.sum(numeric_only=True)
-
-                st.dataframe(pivot, use_container_width=True)
-
-                # MultiIndex safe Excel download
-                buffer = io.BytesIO()
-                with pd.ExcelWriter(buffer, engine="xlsxwriter") as writer:
-                    pivot.to_excel(writer, index=True)
-                st.download_button("⬇️ Download Brand Pivot", buffer.getvalue(), "brand_pivot.xlsx")
+                pivot_tab(brand_date, "brand_pivot.xlsx", "⬇️ Download Brand Pivot", "dl_brand_date")
 
 
             with tab2:
-                pivot = final_df.pivot_table(
-                    index="Manager",
-                    columns="Order Date",
-                    values=["Final Sale Units", "Sales"],
-                    aggfunc="sum",
-                    fill_value=0
-                )
-
-                pivot.columns = pivot.columns.swaplevel(0, 1)
-                pivot = pivot.sort_index(axis=1, level=0)
-
-                pivot.columns = pd.MultiIndex.from_tuples(
-                    [(date, "Final Sale Units") if metric == "Final Sale Units" else (date, "Sales")
-                    for date, metric in pivot.columns]
-                )
-
-                # Add totals columns on right
-                pivot["Total sum of Final Sale Units"] = final_df.groupby("Manager")["Final Sale Units"].sum()
-                pivot["Total sum of Sales"] = final_df.groupby("Manager")["Sales"].sum()
-
-                # Grand Total row
-                pivot.loc["Grand Total"] = pivot.sum(numeric_only=True)
-
-                st.dataframe(pivot, use_container_width=True)
-
-                buffer = io.BytesIO()
-                with pd.ExcelWriter(buffer, engine="xlsxwriter") as writer:
-                    pivot.to_excel(writer, index=True)
-                st.download_button("⬇️ Download Manager Pivot", buffer.getvalue(), "manager_pivot.xlsx")
+                pivot_tab(manager_date, "manager_pivot.xlsx", "⬇️ Download Manager Pivot", "dl_manager_date")
 
             # ---------- TAB 3 ----------
             with tab3:
-                st.dataframe(final_df, use_container_width=True)
-                download_excel(final_df, "raw_data.xlsx", "⬇️ Download Raw Data")
+                raw_data_tab(final_df)
 
             # ---------- TAB 4 ----------
             with tab4:
-                fig = px.bar(
-                    final_df.groupby("Brand")["Sales"].sum().reset_index(),
-                    x="Brand",
-                    y="Sales",
-                    title="Sales by Brand"
-                )
-                st.plotly_chart(fig, use_container_width=True)
+                chart_tab(brand_chart)
 
             # ---------- TAB 5 ----------
             with tab5:
-                # remove 0 - 22/12/2025 changes
-                filtered_df = final_df[final_df["Final Sale Units"] > 0]
-                # Correct aggregation
-                base = final_df.groupby(
-                    ["FNS", "Brand", "Product Name", "Vendor SKU Codes"]
-                ).agg({
-                    "Final Sale Units": "sum",
-                    "Sales": "sum",
-                    "cost": "mean"   # ✔ cost ka average lo
-                })
-
-                # Correct multiplication after aggregation
-                base["As Per Qty Cost"] = base["cost"] * base["Final Sale Units"]
-
-                # Grand Total row (cost ka bhi overall mean rakho)
-                grand = pd.DataFrame(
-                    [[
-                        base["Final Sale Units"].sum(),
-                        base["Sales"].sum(),
-                        base["cost"].mean(),
-                        (base["cost"] * base["Final Sale Units"]).sum()
-                    ]],
-                    index=pd.MultiIndex.from_tuples(
-                        [("Grand Total", "", "", "")],
-                        names=base.index.names
-                    ),
-                    columns=["Final Sale Units", "Sales", "cost", "As Per Qty Cost"]
-                )
-
-                pivot_df = pd.concat([base, grand])
-
-                # Display & download
-                st.dataframe(pivot_df, use_container_width=True)
-                download_excel(pivot_df, "brand_fns_pivot.xlsx", "⬇️ Download Brand/FNS Pivot")
+                pivot_tab(brand_fns, "brand_fns_pivot.xlsx", "⬇️ Download Brand/FNS Pivot", "dl_brand_fns")
 
             # ---------- TAB 6 ----------
             with tab6:
-                # remove 0 from final sale units - 22/12/2025
-                filtered_df = final_df[final_df["Final Sale Units"] > 0]
-                base = final_df.groupby(
-                    ["FNS", "Manager", "Brand", "Product Name", "Vendor SKU Codes"]
-                ).agg({
-                    "Final Sale Units": "sum",
-                    "Sales": "sum",
-                    "cost": "mean"  # ⚠ cost ko sum nahi, average/mean rakho
-                })
-
-                # Ab correct multiplication karo:
-                base["As Per Qty Cost"] = base["cost"] * base["Final Sale Units"]
-
-                # Grand total row
-                grand = pd.DataFrame(
-                    [[base["Final Sale Units"].sum(), base["Sales"].sum(), base["cost"].mean(), (base["cost"] * base["Final Sale Units"]).sum()]],
-                    index=pd.MultiIndex.from_tuples(
-                        [("Grand Total", "", "", "", "")],
-                        names=base.index.names
-                    ),
-                    columns=["Final Sale Units", "Sales", "cost", "As Per Qty Cost"]
-                )
-
-                pivot_df = pd.concat([base, grand])
-                st.dataframe(pivot_df, use_container_width=True)
-
-                download_excel(pivot_df, "manager_brand_fns_pivot.xlsx", "⬇️ Download Manager/Brand/FNS Pivot")
+                pivot_tab(manager_brand_fns, "manager_brand_fns_pivot.xlsx", "⬇️ Download Manager/Brand/FNS Pivot", "dl_manager_brand_fns")
 
             # ---------- TAB 7 : BRAND PIVOT ----------
             with tab7:
-                brand_pivot = final_df.pivot_table(
-                    index="Brand",
-                    values=["Final Sale Units", "Sales"],
-                    aggfunc="sum",
-                    fill_value=0
-                ).rename(columns={
-                    "Final Sale Units": "Sum of Final Sale Units",
-                    "Sales": "Sum of Final Sale Amount"
-                })
-
-                brand_pivot.loc["Grand Total"] = brand_pivot.sum(numeric_only=True)
-            
-                st.dataframe(brand_pivot, use_container_width=True)
-                download_excel(brand_pivot, "brand_pivot.xlsx", "⬇️ Download Brand Pivot")
+                pivot_tab(brand_pivot, "brand_pivot.xlsx", "⬇️ Download Brand Pivot", "dl_brand_pivot")
             
             # ---------- TAB 8 : BRAND MANAGER PIVOT ----------
             with tab8:
-                manager_pivot = final_df.pivot_table(
-                    index="Manager",
-                    values=["Final Sale Units", "Sales"],
-                    aggfunc="sum",
-                    fill_value=0
-                ).rename(columns={
-                    "Final Sale Units": "Sum of Final Sale Units",
-                    "Sales": "Sum of Final Sale Amount"
-                })
-
-                manager_pivot.loc["Grand Total"] = manager_pivot.sum(numeric_only=True)
-            
-                st.dataframe(manager_pivot, use_container_width=True)
-                download_excel(manager_pivot, "manager_pivot.xlsx", "⬇️ Download Manager Pivot")
+                pivot_tab(manager_pivot, "manager_pivot.xlsx", "⬇️ Download Manager Pivot", "dl_manager_pivot")
+
+            # ---------- DOWNLOAD ALL ----------
+            download_workbook(
+                (
+                    ("Brand Analysis", brand_date),
+                    ("Manager Analysis", manager_date),
+                    ("Raw Data", final_df),
+                    ("Brand FNS Pivot", brand_fns),
+                    ("Manager Brand FNS Pivot", manager_brand_fns),
+                    ("Brand Pivot", brand_pivot),
+                    ("Brand Manager Pivot", manager_pivot)
+                ),
+                "flipkart_sales_report.xlsx",
+                "📦 Download All"
+            )
 
             st.success("✅ Analysis generated successfully!")
 